@@ -0,0 +1,17 @@
+// Required before running workers: concurrent shards and workers MERGE the same Ingredient, Product and
+// Cuisine nodes, and only a uniqueness constraint makes MERGE lock on the id so no duplicates are created.
+// Each constraint also provides the index behind the {id: ...} lookups.
+CREATE CONSTRAINT recipe_id_unique IF NOT EXISTS
+FOR (n:Recipe) REQUIRE n.id IS UNIQUE;
+
+CREATE CONSTRAINT ingredient_id_unique IF NOT EXISTS
+FOR (n:Ingredient) REQUIRE n.id IS UNIQUE;
+
+CREATE CONSTRAINT product_id_unique IF NOT EXISTS
+FOR (n:Product) REQUIRE n.id IS UNIQUE;
+
+CREATE CONSTRAINT cuisine_id_unique IF NOT EXISTS
+FOR (n:Cuisine) REQUIRE n.id IS UNIQUE;
+
+CREATE CONSTRAINT recipe_nutrition_value_id_unique IF NOT EXISTS
+FOR (n:RecipeNutritionValue) REQUIRE n.id IS UNIQUE;
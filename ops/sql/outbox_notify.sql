@@ -0,0 +1,14 @@
+-- Wake recipe workers as soon as new outbox rows commit (NOTIFY is delivered on commit).
+-- Statement-level so a bulk insert sends one notification, not one per row.
+-- The channel must match the workers' OUTBOX_NOTIFY_CHANNEL (default outbox_new).
+CREATE OR REPLACE FUNCTION notify_outbox_new() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify('outbox_new', '');
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS outbox_events_notify ON outbox_events;
+CREATE TRIGGER outbox_events_notify
+AFTER INSERT ON outbox_events
+FOR EACH STATEMENT EXECUTE FUNCTION notify_outbox_new();
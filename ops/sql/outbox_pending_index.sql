@@ -0,0 +1,4 @@
+-- Partial index for the worker claim query: only unprocessed rows, in claim order.
+CREATE INDEX IF NOT EXISTS outbox_events_pending_idx
+ON outbox_events (created_at, id)
+WHERE processed_at IS NULL;
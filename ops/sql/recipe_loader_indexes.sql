@@ -0,0 +1,9 @@
+-- Indexes backing the batched aggregate loader (each query filters by a set of recipe ids).
+CREATE INDEX IF NOT EXISTS recipe_ratings_recipe_id_idx
+ON recipe_ratings (recipe_id);
+
+CREATE INDEX IF NOT EXISTS recipe_ingredients_recipe_order_idx
+ON recipe_ingredients (recipe_id, ingredient_order);
+
+CREATE INDEX IF NOT EXISTS nutrition_facts_entity_idx
+ON nutrition_facts (entity_type, entity_id);
@@ -1,26 +1,82 @@
-from typing import Any, Dict, Iterable
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 
-from neo4j import GraphDatabase, Transaction
+from neo4j import AsyncGraphDatabase, AsyncManagedTransaction, AsyncSession
+from neo4j.exceptions import DriverError, Neo4jError
+
+
+async def _run_write(tx: AsyncManagedTransaction, cypher: str, parameters: Dict[str, Any]) -> None:
+    result = await tx.run(cypher, **parameters)
+    await result.consume()
+
+
+async def _run_writes(tx: AsyncManagedTransaction, statements: List[Tuple[str, Dict[str, Any]]]) -> None:
+    for cypher, parameters in statements:
+        await _run_write(tx, cypher, parameters)
 
 
 class Neo4jClient:
-    """Thin wrapper around the Neo4j driver to keep a consistent API."""
+    """Thin wrapper around the async Neo4j driver to keep a consistent API."""
+
+    def __init__(self, uri: str, user: str, password: str, max_connection_pool_size: int = 100):
+        self._driver = AsyncGraphDatabase.driver(
+            uri, auth=(user, password), max_connection_pool_size=max_connection_pool_size
+        )
+
+    async def close(self) -> None:
+        await self._driver.close()
+
+    def session(self) -> AsyncSession:
+        """Open a session to share across calls; use ``async with`` and never from two tasks at once."""
+        return self._driver.session()
+
+    @asynccontextmanager
+    async def _session(self, session: Optional[AsyncSession]) -> AsyncIterator[AsyncSession]:
+        if session is not None:
+            yield session
+            return
+        async with self._driver.session() as owned:
+            yield owned
 
-    def __init__(self, uri: str, user: str, password: str):
-        self._driver = GraphDatabase.driver(uri, auth=(user, password))
+    async def write(self, cypher: str, parameters: Dict[str, Any], session: Optional[AsyncSession] = None) -> None:
+        async with self._session(session) as active:
+            await active.execute_write(_run_write, cypher, parameters)
 
-    def close(self) -> None:
-        self._driver.close()
+    async def write_all(
+        self, statements: List[Tuple[str, Dict[str, Any]]], session: Optional[AsyncSession] = None
+    ) -> None:
+        """Run several statements in order inside a single write transaction."""
+        async with self._session(session) as active:
+            await active.execute_write(_run_writes, statements)
 
-    def write(self, cypher: str, parameters: Dict[str, Any]) -> None:
-        with self._driver.session() as session:
-            session.execute_write(lambda tx: tx.run(cypher, **parameters))
+    async def write_autocommit(
+        self,
+        statements: List[Tuple[str, Dict[str, Any]]],
+        session: Optional[AsyncSession] = None,
+        max_attempts: int = 3,
+        backoff_seconds: float = 0.5,
+    ) -> None:
+        """Run statements in auto-commit transactions (for CALL ... IN TRANSACTIONS), retrying transient errors."""
+        async with self._session(session) as active:
+            for cypher, parameters in statements:
+                for attempt in range(1, max_attempts + 1):
+                    try:
+                        result = await active.run(cypher, **parameters)
+                        await result.consume()
+                        break
+                    except (Neo4jError, DriverError) as exc:
+                        if attempt == max_attempts or not exc.is_retryable():
+                            raise
+                        await asyncio.sleep(backoff_seconds * 2 ** (attempt - 1))
 
-    def write_transaction(self, fn, *args, **kwargs):
-        with self._driver.session() as session:
-            return session.execute_write(fn, *args, **kwargs)
+    async def write_transaction(self, fn, *args, **kwargs):
+        async with self._driver.session() as session:
+            return await session.execute_write(fn, *args, **kwargs)
 
-    def read(self, cypher: str, parameters: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
-        with self._driver.session() as session:
-            result = session.run(cypher, **parameters)
-            return [record.data() for record in result]
+    async def read(
+        self, cypher: str, parameters: Dict[str, Any], session: Optional[AsyncSession] = None
+    ) -> Iterable[Dict[str, Any]]:
+        async with self._session(session) as active:
+            result = await active.run(cypher, **parameters)
+            return [record.data() async for record in result]
@@ -0,0 +1,62 @@
+import asyncio
+
+import psycopg2
+from psycopg2 import sql
+
+
+class OutboxListener:
+    """Dedicated autocommit connection that LISTENs for outbox inserts so idle workers need not poll."""
+
+    def __init__(self, dsn: str, channel: str):
+        self._dsn = dsn
+        self._channel = channel
+        self._conn = self._connect()
+
+    def _connect(self):
+        conn = psycopg2.connect(self._dsn)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("LISTEN {};").format(sql.Identifier(self._channel)))
+        return conn
+
+    def _reconnect(self) -> None:
+        try:
+            self._conn.close()
+        except psycopg2.Error:
+            pass
+        self._conn = self._connect()
+
+    def drain(self) -> int:
+        """Consume pending notifications and return how many arrived."""
+        self._conn.poll()
+        count = len(self._conn.notifies)
+        self._conn.notifies.clear()
+        return count
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for a notification or ``timeout`` seconds; returns True when notified or reconnected."""
+        try:
+            return await self._wait(timeout)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # The idle connection was dropped and notifications may have been missed.
+            self._reconnect()
+            return True
+
+    async def _wait(self, timeout: float) -> bool:
+        if self.drain():
+            return True
+
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        fileno = self._conn.fileno()
+        loop.add_reader(fileno, readable.set)
+        try:
+            await asyncio.wait_for(readable.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            loop.remove_reader(fileno)
+        return self.drain() > 0
+
+    def close(self) -> None:
+        self._conn.close()
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Tuple
 
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_batch
 
 from src.domain.models.events import OutboxEvent
 
@@ -13,7 +13,12 @@ def fetch_pending_events(
     table_names: Optional[List[str]] = None,
     aggregate_types: Optional[List[str]] = None,
 ) -> List[OutboxEvent]:
-    """Fetch a batch of pending outbox events with SKIP LOCKED to support concurrency."""
+    """Claim a batch of pending outbox events with SKIP LOCKED to support concurrency.
+
+    Row locks and per-aggregate advisory locks last for the caller's transaction, so settle the events
+    (mark_*_many) and commit on the same connection. Until then other runners skip the claimed rows and
+    every event for the same aggregates, so two runners never write one aggregate concurrently.
+    """
     filters = ["processed_at IS NULL"]
     params: List = []
 
@@ -31,12 +36,18 @@ def fetch_pending_events(
 
     where_clause = " AND ".join(filters)
     sql = f"""
-    SELECT id, aggregate_type, table_name, op, aggregate_id, payload, created_at, attempts
-    FROM outbox_events
-    WHERE {where_clause}
-    ORDER BY created_at
-    FOR UPDATE SKIP LOCKED
-    LIMIT %s;
+    WITH candidates AS MATERIALIZED (
+        SELECT id, aggregate_type, table_name, op, aggregate_id, payload, created_at, attempts
+        FROM outbox_events
+        WHERE {where_clause}
+        ORDER BY created_at, id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    SELECT *
+    FROM candidates
+    WHERE pg_try_advisory_xact_lock(hashtextextended(aggregate_id::text, 0))
+    ORDER BY created_at, id;
     """
     params.append(batch_size)
 
@@ -46,14 +57,19 @@ def fetch_pending_events(
     return [OutboxEvent(**row) for row in rows]
 
 
-def mark_processed(conn, event_id) -> None:
-    sql = "UPDATE outbox_events SET processed_at = NOW(), error_message = NULL WHERE id = %s;"
+def mark_processed_many(conn, event_ids: List[str]) -> None:
+    """Mark a whole batch processed in one statement; like mark_failed_many, it never commits."""
+    if not event_ids:
+        return
+    sql = "UPDATE outbox_events SET processed_at = NOW(), error_message = NULL WHERE id IN %s;"
     with conn.cursor() as cur:
-        cur.execute(sql, (event_id,))
-    conn.commit()
+        cur.execute(sql, (tuple(event_ids),))
 
 
-def mark_failed(conn, event_id, error_message: str) -> None:
+def mark_failed_many(conn, failures: List[Tuple[str, str]]) -> None:
+    """Record (event_id, error_message) failures, sending the updates in one batched round trip."""
+    if not failures:
+        return
     sql = """
     UPDATE outbox_events
     SET attempts = attempts + 1,
@@ -62,5 +78,4 @@ def mark_failed(conn, event_id, error_message: str) -> None:
     WHERE id = %s;
     """
     with conn.cursor() as cur:
-        cur.execute(sql, (error_message[:1000], event_id))
-    conn.commit()
+        execute_batch(cur, sql, [(error_message[:1000], event_id) for event_id, error_message in failures])
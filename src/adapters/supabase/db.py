@@ -1,24 +1,32 @@
 from contextlib import contextmanager
-from typing import Iterator, Optional
+from typing import Iterator, List, Optional, Tuple
 
 import psycopg2
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import ThreadedConnectionPool
 
 
 class PostgresPool:
     """Minimal connection pool for Supabase Postgres (Gold layer)."""
 
     def __init__(self, dsn: str, minconn: int = 1, maxconn: int = 5):
-        self._pool = SimpleConnectionPool(minconn, maxconn, dsn=dsn, cursor_factory=RealDictCursor)
+        self._pool = ThreadedConnectionPool(minconn, maxconn, dsn=dsn, cursor_factory=RealDictCursor)
 
     @contextmanager
     def connection(self) -> Iterator[psycopg2.extensions.connection]:
-        conn = self._pool.getconn()
+        conn = self.acquire()
         try:
             yield conn
         finally:
-            self._pool.putconn(conn)
+            self.release(conn)
+
+    def acquire(self) -> psycopg2.extensions.connection:
+        """Check out a connection that outlives a ``with`` block (e.g. handed between coroutines)."""
+        return self._pool.getconn()
+
+    def release(self, conn: psycopg2.extensions.connection) -> None:
+        self._pool.putconn(conn)
 
     def close(self) -> None:
         self._pool.closeall()
@@ -36,7 +44,30 @@ def fetch_all(conn, query: str, params: Optional[tuple] = None):
         return cur.fetchall()
 
 
+@contextmanager
+def savepoint(conn, name: str = "step") -> Iterator[None]:
+    """Run a block inside a SAVEPOINT, rolling back only to it on error."""
+    name_sql = sql.Identifier(name)
+    with conn.cursor() as cur:
+        cur.execute(sql.SQL("SAVEPOINT {}").format(name_sql))
+    try:
+        yield
+    except BaseException:
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("ROLLBACK TO SAVEPOINT {}").format(name_sql))
+        raise
+    with conn.cursor() as cur:
+        cur.execute(sql.SQL("RELEASE SAVEPOINT {}").format(name_sql))
+
+
 def execute(conn, query: str, params: Optional[tuple] = None) -> None:
     with conn.cursor() as cur:
         cur.execute(query, params or ())
     conn.commit()
+
+
+def fetch_all_tuples(conn, query: str, params: Optional[tuple] = None) -> Tuple[List[str], List[tuple]]:
+    """Like fetch_all, but returns plain tuple rows plus column names instead of the pool's dict rows."""
+    with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+        cur.execute(query, params or ())
+        return [column[0] for column in cur.description], cur.fetchall()
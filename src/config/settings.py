@@ -8,12 +8,21 @@ class Settings(BaseSettings):
     neo4j_uri: str = Field(..., env="NEO4J_URI")
     neo4j_user: str = Field(..., env="NEO4J_USER")
     neo4j_password: str = Field(..., env="NEO4J_PASSWORD")
+    neo4j_pool_size: int = Field(8, env="NEO4J_POOL_SIZE")
+    # Shards with more ingredient + nutrition rows than this commit every N recipes instead of in one tx.
+    neo4j_chunk_threshold_rows: int = Field(5000, env="NEO4J_CHUNK_THRESHOLD_ROWS")
+    neo4j_recipes_per_transaction: int = Field(25, env="NEO4J_RECIPES_PER_TRANSACTION")
     queue_url: str = Field(..., env="QUEUE_URL")
     pipeline_name: str = Field("recipes", env="PIPELINE_NAME")
 
+    # Idle workers wait on LISTEN; this is only the fallback re-poll (e.g. for retries of failed events).
     poll_interval_seconds: int = Field(5, env="POLL_INTERVAL_SECONDS")
+    # Must match the channel in ops/sql/outbox_notify.sql, or workers only ever wake on the poll.
+    notify_channel: str = Field("outbox_new", env="OUTBOX_NOTIFY_CHANNEL")
     batch_size: int = Field(100, env="BATCH_SIZE")
     max_attempts: int = Field(5, env="MAX_ATTEMPTS")
+    nutrient_cache_ttl_seconds: int = Field(300, env="NUTRIENT_CACHE_TTL_SECONDS")
+    skip_unchanged: bool = Field(True, env="SKIP_UNCHANGED")
 
     class Config:
         env_file = ".env"
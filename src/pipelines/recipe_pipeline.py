@@ -1,4 +1,15 @@
-from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import zlib
+from dataclasses import dataclass, field
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from neo4j import AsyncSession
 
 from src.adapters.neo4j.client import Neo4jClient
 from src.adapters.supabase import db as pg
@@ -6,6 +17,234 @@ from src.config.settings import Settings
 from src.domain.models.events import OutboxEvent
 from src.utils.logging import configure_logging
 
+_RECIPES_SQL = """
+SELECT r.*, c.id AS cuisine_id, c.name AS cuisine_name, c.code AS cuisine_code
+FROM recipes r
+LEFT JOIN cuisines c ON c.id = r.cuisine_id
+WHERE r.id IN %s;
+"""
+
+_NUTRITION_SQL = """
+SELECT nf.entity_id AS recipe_id,
+       nf.id, nf.nutrient_id, nf.amount, nf.unit, nf.per_amount, nf.per_amount_grams,
+       nf.percent_daily_value, nf.data_source, nf.confidence_score, nf.measurement_date
+FROM nutrition_facts nf
+WHERE nf.entity_type = 'recipe' AND nf.entity_id IN %s
+ORDER BY nf.entity_id, nf.id;
+"""
+
+_INGREDIENTS_SQL = """
+SELECT ri.recipe_id,
+       ri.ingredient_id AS id, i.name, ri.quantity, ri.unit, ri.quantity_normalized_g,
+       ri.ingredient_order, ri.preparation_note, ri.is_optional, ri.product_id
+FROM recipe_ingredients ri
+LEFT JOIN ingredients i ON i.id = ri.ingredient_id
+WHERE ri.recipe_id IN %s
+ORDER BY ri.recipe_id, ri.ingredient_order NULLS LAST, ri.ingredient_id;
+"""
+
+_RATINGS_SQL = """
+SELECT recipe_id,
+       AVG(rating)::float8 AS avg_rating,
+       COUNT(*) AS rating_count
+FROM recipe_ratings
+WHERE recipe_id IN %s
+GROUP BY recipe_id;
+"""
+
+_UPSERT_RECIPE_CYPHER = """
+UNWIND $batch AS row
+MERGE (r:Recipe {id: row.recipe.id})
+SET r.title = row.recipe.title,
+    r.description = row.recipe.description,
+    r.meal_type = row.recipe.meal_type,
+    r.difficulty = row.recipe.difficulty,
+    r.prep_time_minutes = row.recipe.prep_time_minutes,
+    r.cook_time_minutes = row.recipe.cook_time_minutes,
+    r.total_time_minutes = row.recipe.total_time_minutes,
+    r.servings = row.recipe.servings,
+    r.image_url = row.recipe.image_url,
+    r.source_url = row.recipe.source_url,
+    r.source_type = row.recipe.source_type,
+    r.instructions = row.recipe.instructions,
+    r.percent_calories_protein = row.recipe.percent_calories_protein,
+    r.percent_calories_fat = row.recipe.percent_calories_fat,
+    r.percent_calories_carbs = row.recipe.percent_calories_carbs,
+    r.avg_rating = coalesce(row.ratings.avg_rating, 0.0),
+    r.rating_count = coalesce(row.ratings.rating_count, 0),
+    r.updated_at = datetime(row.recipe.updated_at),
+    r.created_at = datetime(row.recipe.created_at);
+"""
+
+# Drop only a cuisine edge that no longer matches, then MERGE the current one.
+_UPSERT_CUISINE_CYPHER = """
+UNWIND $batch AS row
+MATCH (r:Recipe {id: row.recipe.id})
+OPTIONAL MATCH (r)-[oldCuisine:HAS_CUISINE]->(old:Cuisine)
+WHERE row.recipe.cuisine_id IS NULL OR old.id <> row.recipe.cuisine_id
+DELETE oldCuisine
+WITH DISTINCT r, row
+WHERE row.recipe.cuisine_id IS NOT NULL
+MERGE (c:Cuisine {id: row.recipe.cuisine_id})
+SET c.name = row.recipe.cuisine_name,
+    c.code = row.recipe.cuisine_code
+MERGE (r)-[:HAS_CUISINE]->(c);
+"""
+
+# Prune stale ingredient/product edges, then upsert both in a single pass over the ingredients.
+_UPSERT_INGREDIENTS_CYPHER = """
+UNWIND $batch AS row
+MATCH (r:Recipe {id: row.recipe.id})
+CALL {
+  WITH r, row
+  MATCH (r)-[old:USES_INGREDIENT|USES_PRODUCT]->(target)
+  WHERE NOT target.id IN CASE type(old)
+    WHEN 'USES_INGREDIENT' THEN row.ingredient_ids
+    ELSE row.product_ids
+  END
+  DELETE old
+}
+UNWIND row.ingredients AS ing
+MERGE (i:Ingredient {id: ing.id})
+SET i.name = coalesce(ing.name, i.name)
+MERGE (r)-[ri:USES_INGREDIENT]->(i)
+SET ri.quantity = ing.quantity,
+    ri.unit = ing.unit,
+    ri.quantity_normalized_g = ing.quantity_normalized_g,
+    ri.ingredient_order = ing.ingredient_order,
+    ri.preparation_note = ing.preparation_note,
+    ri.is_optional = ing.is_optional
+FOREACH (_ IN CASE WHEN ing.product_id IS NULL THEN [] ELSE [1] END |
+  MERGE (p:Product {id: ing.product_id})
+  MERGE (r)-[rp:USES_PRODUCT]->(p)
+  SET rp += {
+    quantity: ing.quantity,
+    unit: ing.unit,
+    quantity_normalized_g: ing.quantity_normalized_g,
+    ingredient_order: ing.ingredient_order
+  }
+);
+"""
+
+# Upsert RecipeNutritionValue nodes by stable id (elementId seek, id lookup on a miss), then delete the rest.
+_UPSERT_NUTRITION_CYPHER = """
+UNWIND $batch AS row
+MATCH (r:Recipe {id: row.recipe.id})
+CALL {
+  WITH r, row
+  UNWIND row.nutrition_facts AS nf
+  OPTIONAL MATCH (cached:NutrientDefinition)
+  WHERE elementId(cached) = nf.nutrient_element_id AND cached.id = nf.nutrient_id
+  OPTIONAL MATCH (byId:NutrientDefinition {id: nf.nutrient_id})
+  WHERE cached IS NULL
+  WITH r, nf, coalesce(cached, byId) AS nd
+  WHERE nd IS NOT NULL
+  MERGE (nv:RecipeNutritionValue {id: nf.id})
+  SET nv.amount = nf.amount,
+      nv.unit = nf.unit,
+      nv.per_amount = nf.per_amount,
+      nv.per_amount_grams = nf.per_amount_grams,
+      nv.percent_daily_value = nf.percent_daily_value,
+      nv.data_source = nf.data_source,
+      nv.confidence_score = nf.confidence_score,
+      nv.measurement_date = nf.measurement_date
+  MERGE (r)-[:HAS_NUTRITION_VALUE]->(nv)
+  MERGE (nv)-[:OF_NUTRIENT]->(nd)
+  WITH nv, nd
+  CALL {
+    WITH nv, nd
+    OPTIONAL MATCH (nv)-[staleOf:OF_NUTRIENT]->(other:NutrientDefinition)
+    WHERE other <> nd
+    DELETE staleOf
+  }
+  RETURN collect(nv.id) AS kept
+}
+OPTIONAL MATCH (r)-[:HAS_NUTRITION_VALUE]->(oldNv:RecipeNutritionValue)
+WHERE NOT oldNv.id IN kept
+DETACH DELETE oldNv;
+"""
+
+# Stamped last so a partially applied chunked write is never mistaken for an unchanged aggregate.
+_UPSERT_CONTENT_HASH_CYPHER = """
+UNWIND $batch AS row
+MATCH (r:Recipe {id: row.recipe.id})
+SET r.content_hash = row.content_hash;
+"""
+
+# Per-relationship statements, run in order inside one write transaction.
+_UPSERT_CYPHERS = (
+    _UPSERT_RECIPE_CYPHER,
+    _UPSERT_CUISINE_CYPHER,
+    _UPSERT_INGREDIENTS_CYPHER,
+    _UPSERT_NUTRITION_CYPHER,
+    _UPSERT_CONTENT_HASH_CYPHER,
+)
+
+_NUTRIENT_DEFINITIONS_CYPHER = "MATCH (n:NutrientDefinition) RETURN n.id AS id, elementId(n) AS element_id;"
+
+_UNCHANGED_RECIPES_CYPHER = """
+UNWIND $rows AS row
+MATCH (r:Recipe {id: row.id})
+WHERE r.content_hash = row.content_hash
+RETURN r.id AS id;
+"""
+
+_DELETE_CYPHER = "UNWIND $ids AS id MATCH (r:Recipe {id: id}) DETACH DELETE r;"
+
+
+def _in_transactions(cypher: str, rows_per_transaction: int) -> str:
+    """Wrap an ``UNWIND $batch AS row`` statement so Neo4j commits every ``rows_per_transaction`` rows."""
+    prefix = "UNWIND $batch AS row"
+    body = cypher.strip().rstrip(";")
+    if not body.startswith(prefix):
+        raise ValueError("Only UNWIND $batch AS row statements can be chunked")
+    return (
+        f"{prefix}\nCALL {{\n  WITH row{body[len(prefix):]}\n}} "
+        f"IN TRANSACTIONS OF {int(rows_per_transaction)} ROWS;"
+    )
+
+
+def _group_by_recipe(columns: List[str], rows: Iterable[tuple]) -> Dict[str, List[Dict]]:
+    """Group tuple rows sorted by their leading ``recipe_id`` column into per-recipe lists of dicts."""
+    fields = columns[1:]
+    return {
+        str(recipe_id): [dict(zip(fields, row[1:])) for row in group]
+        for recipe_id, group in groupby(rows, key=itemgetter(0))
+    }
+
+
+def _shard_by_recipe(upserts: List[Dict], max_shards: int) -> List[List[Dict]]:
+    """Split upserts into at most ``max_shards`` non-empty shards; a recipe always lands in the same one."""
+    shard_count = max(1, min(max_shards, len(upserts)))
+    shards: List[List[Dict]] = [[] for _ in range(shard_count)]
+    for row in upserts:
+        shards[zlib.crc32(str(row["recipe"]["id"]).encode()) % shard_count].append(row)
+    return [shard for shard in shards if shard]
+
+
+def _content_hash(row: Dict) -> str:
+    """Stable digest of an upsert row; equal digests mean the graph already holds this aggregate."""
+    payload = json.dumps(row, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _stamp_content_hashes(upserts: List[Dict]) -> None:
+    """Hash each row exactly as it will be sent, so call this after nutrient resolution."""
+    for row in upserts:
+        row.pop("content_hash", None)
+        row["content_hash"] = _content_hash(row)
+
+
+@dataclass
+class LoadedBatch:
+    """Outbox events resolved against Supabase, ready to be written to Neo4j."""
+
+    events: List[OutboxEvent]
+    upserts: List[Dict] = field(default_factory=list)
+    deleted_ids: List[str] = field(default_factory=list)
+    # Set when the batch could not be loaded as a whole; its events are then retried one by one.
+    load_error: Optional[Exception] = None
+
 
 class RecipePipeline:
     """Upserts Recipe aggregates (recipe + nutrition + ingredients + cuisine + ratings) into Neo4j."""
@@ -15,170 +254,166 @@ class RecipePipeline:
         self.pg_pool = pg_pool
         self.neo4j = neo4j
         self.log = configure_logging("recipe_pipeline")
+        # NutrientDefinition id -> elementId, refreshed every nutrient_cache_ttl_seconds.
+        self._nutrient_element_ids: Dict[str, str] = {}
+        self._nutrient_cache_loaded_at: Optional[float] = None
+        # Ids with no definition at the last refresh; warned about once per refresh.
+        self._missing_nutrient_ids: Set[str] = set()
+        self._chunked_upsert_cyphers = tuple(
+            _in_transactions(cypher, settings.neo4j_recipes_per_transaction) for cypher in _UPSERT_CYPHERS
+        )
 
     # ===================== DATA LOADERS =====================
-    def load_recipe(self, conn, recipe_id: str) -> Optional[Dict]:
-        sql = """
-        SELECT r.*, c.id AS cuisine_id, c.name AS cuisine_name, c.code AS cuisine_code
-        FROM recipes r
-        LEFT JOIN cuisines c ON c.id = r.cuisine_id
-        WHERE r.id = %s;
-        """
-        return pg.fetch_one(conn, sql, (recipe_id,))
-
-    def load_nutrition_facts(self, conn, recipe_id: str) -> List[Dict]:
-        sql = """
-        SELECT nf.id, nf.nutrient_id, nf.amount, nf.unit, nf.per_amount, nf.per_amount_grams,
-               nf.percent_daily_value, nf.data_source, nf.confidence_score, nf.measurement_date
-        FROM nutrition_facts nf
-        WHERE nf.entity_type = 'recipe' AND nf.entity_id = %s;
-        """
-        return pg.fetch_all(conn, sql, (recipe_id,))
-
-    def load_ingredients(self, conn, recipe_id: str) -> List[Dict]:
-        sql = """
-        SELECT ri.ingredient_id AS id, i.name, ri.quantity, ri.unit, ri.quantity_normalized_g,
-               ri.ingredient_order, ri.preparation_note, ri.is_optional, ri.product_id
-        FROM recipe_ingredients ri
-        LEFT JOIN ingredients i ON i.id = ri.ingredient_id
-        WHERE ri.recipe_id = %s
-        ORDER BY ri.ingredient_order NULLS LAST;
-        """
-        return pg.fetch_all(conn, sql, (recipe_id,))
-
-    def load_ratings(self, conn, recipe_id: str) -> Dict:
-        sql = """
-        SELECT COALESCE(AVG(rating), 0) AS avg_rating,
-               COUNT(*) AS rating_count
-        FROM recipe_ratings
-        WHERE recipe_id = %s;
-        """
-        row = pg.fetch_one(conn, sql, (recipe_id,))
-        return row or {"avg_rating": 0, "rating_count": 0}
-
-    # ===================== CYPHER =====================
-    def _upsert_cypher(self) -> str:
-        """Cypher script to rebuild all recipe relationships idempotently."""
-        return """
-        MERGE (r:Recipe {id: $recipe.id})
-        SET r.title = $recipe.title,
-            r.description = $recipe.description,
-            r.meal_type = $recipe.meal_type,
-            r.difficulty = $recipe.difficulty,
-            r.prep_time_minutes = $recipe.prep_time_minutes,
-            r.cook_time_minutes = $recipe.cook_time_minutes,
-            r.total_time_minutes = $recipe.total_time_minutes,
-            r.servings = $recipe.servings,
-            r.image_url = $recipe.image_url,
-            r.source_url = $recipe.source_url,
-            r.source_type = $recipe.source_type,
-            r.instructions = $recipe.instructions,
-            r.percent_calories_protein = $recipe.percent_calories_protein,
-            r.percent_calories_fat = $recipe.percent_calories_fat,
-            r.percent_calories_carbs = $recipe.percent_calories_carbs,
-            r.avg_rating = $ratings.avg_rating,
-            r.rating_count = $ratings.rating_count,
-            r.updated_at = datetime($recipe.updated_at),
-            r.created_at = datetime($recipe.created_at)
-
-        // Cuisine
-        WITH r
-        OPTIONAL MATCH (r)-[oldCuisine:HAS_CUISINE]->(:Cuisine)
-        DELETE oldCuisine;
-        WITH r
-        FOREACH (_ IN CASE WHEN $recipe.cuisine_id IS NULL THEN [] ELSE [1] END |
-          MERGE (c:Cuisine {id: $recipe.cuisine_id})
-          SET c.name = $recipe.cuisine_name,
-              c.code = $recipe.cuisine_code
-          MERGE (r)-[:HAS_CUISINE]->(c)
-        )
+    def load_aggregates(
+        self, conn, recipe_ids: List[str]
+    ) -> Tuple[Dict[str, Dict], Dict[str, List[Dict]], Dict[str, List[Dict]], Dict[str, Dict]]:
+        """Load recipes, nutrition, ingredients and ratings for a batch: four queries on one connection."""
+        params = (tuple(recipe_ids),)
+        recipe_result = pg.fetch_all_tuples(conn, _RECIPES_SQL, params)
+        nutrition_result = pg.fetch_all_tuples(conn, _NUTRITION_SQL, params)
+        ingredient_result = pg.fetch_all_tuples(conn, _INGREDIENTS_SQL, params)
+        rating_result = pg.fetch_all_tuples(conn, _RATINGS_SQL, params)
+        recipe_columns, recipe_rows = recipe_result
+        id_index = recipe_columns.index("id")
+        recipes = {str(row[id_index]): dict(zip(recipe_columns, row)) for row in recipe_rows}
+        # Recipes without ratings are simply absent; the recipe statement coalesces the nulls.
+        rating_columns, rating_rows = rating_result
+        ratings = {str(row[0]): dict(zip(rating_columns[1:], row[1:])) for row in rating_rows}
+        return recipes, _group_by_recipe(*nutrition_result), _group_by_recipe(*ingredient_result), ratings
+
+    # ===================== NUTRIENT DEFINITIONS =====================
+    async def _nutrient_definitions(self, session: Optional[AsyncSession] = None) -> Dict[str, str]:
+        now = time.monotonic()
+        loaded_at = self._nutrient_cache_loaded_at
+        if loaded_at is None or now - loaded_at >= self.settings.nutrient_cache_ttl_seconds:
+            rows = await self.neo4j.read(_NUTRIENT_DEFINITIONS_CYPHER, {}, session=session)
+            self._nutrient_element_ids = {str(row["id"]): row["element_id"] for row in rows}
+            self._nutrient_cache_loaded_at = now
+            self._missing_nutrient_ids = set()
+        return self._nutrient_element_ids
 
-        // Ingredients
-        WITH r
-        OPTIONAL MATCH (r)-[oldIng:USES_INGREDIENT]->(:Ingredient)
-        DELETE oldIng;
-        WITH r
-        OPTIONAL MATCH (r)-[oldProd:USES_PRODUCT]->(:Product)
-        DELETE oldProd;
-        WITH r, $ingredients AS ingredients
-        UNWIND ingredients AS ing
-          MERGE (i:Ingredient {id: ing.id})
-          SET i.name = coalesce(ing.name, i.name)
-          MERGE (r)-[ri:USES_INGREDIENT]->(i)
-          SET ri.quantity = ing.quantity,
-              ri.unit = ing.unit,
-              ri.quantity_normalized_g = ing.quantity_normalized_g,
-              ri.ingredient_order = ing.ingredient_order,
-              ri.preparation_note = ing.preparation_note,
-              ri.is_optional = ing.is_optional;
-        WITH r, $ingredients AS ingredients
-        UNWIND ingredients AS ingProd
-          FOREACH (_ IN CASE WHEN ingProd.product_id IS NULL THEN [] ELSE [1] END |
-            MERGE (p:Product {id: ingProd.product_id})
-            MERGE (r)-[rp:USES_PRODUCT]->(p)
-            SET rp.quantity = ingProd.quantity,
-                rp.unit = ingProd.unit,
-                rp.quantity_normalized_g = ingProd.quantity_normalized_g,
-                rp.ingredient_order = ingProd.ingredient_order
-          )
-
-        // Nutrition values
-        WITH r
-        OPTIONAL MATCH (r)-[oldNv:HAS_NUTRITION_VALUE]->(nv:RecipeNutritionValue)
-        DELETE oldNv, nv;
-        WITH r, $nutrition_facts AS facts
-        UNWIND facts AS nf
-          MATCH (nd:NutrientDefinition {id: nf.nutrient_id})
-          MERGE (nv:RecipeNutritionValue {id: nf.id})
-          SET nv.amount = nf.amount,
-              nv.unit = nf.unit,
-              nv.per_amount = nf.per_amount,
-              nv.per_amount_grams = nf.per_amount_grams,
-              nv.percent_daily_value = nf.percent_daily_value,
-              nv.data_source = nf.data_source,
-              nv.confidence_score = nf.confidence_score,
-              nv.measurement_date = nf.measurement_date
-          MERGE (r)-[:HAS_NUTRITION_VALUE]->(nv)
-          MERGE (nv)-[:OF_NUTRIENT]->(nd);
-        """
-
-    def _delete_cypher(self) -> str:
-        return "MATCH (r:Recipe {id: $id}) DETACH DELETE r;"
+    async def _resolve_nutrients(self, upserts: List[Dict], session: Optional[AsyncSession] = None) -> None:
+        """Tag nutrition rows with their definition's cached elementId; unknown ids fall back to the id lookup."""
+        element_ids = await self._nutrient_definitions(session)
+        missing = set()
+        for row in upserts:
+            for fact in row["nutrition_facts"]:
+                nutrient_id = str(fact["nutrient_id"])
+                fact["nutrient_element_id"] = element_ids.get(nutrient_id)
+                if fact["nutrient_element_id"] is None and nutrient_id not in self._missing_nutrient_ids:
+                    missing.add(nutrient_id)
+        if missing:
+            self._missing_nutrient_ids |= missing
+            self.log.warning("Nutrient definitions missing from Neo4j: %s", ", ".join(sorted(missing)))
 
     # ===================== OPERATIONS =====================
-    def handle_event(self, event: OutboxEvent) -> None:
-        with self.pg_pool.connection() as conn:
-            recipe = self.load_recipe(conn, event.aggregate_id)
-
-        if recipe is None:
-            if event.op.upper() == "DELETE":
-                self.log.info("Deleting recipe from graph", extra={"id": event.aggregate_id})
-                self.neo4j.write(self._delete_cypher(), {"id": event.aggregate_id})
-            else:
-                self.log.warning(
-                    "Recipe missing in Supabase; skipping upsert",
-                    extra={"id": event.aggregate_id, "op": event.op},
+    def load_batch(self, conn, events: List[OutboxEvent]) -> LoadedBatch:
+        """Resolve a batch of outbox events into upsert rows and delete ids on the caller's transaction."""
+        recipe_ids = list(dict.fromkeys(event.aggregate_id for event in events))
+        delete_requested = {event.aggregate_id for event in events if event.op.upper() == "DELETE"}
+
+        recipes, nutrition, ingredients, ratings = self.load_aggregates(conn, recipe_ids)
+
+        loaded = LoadedBatch(events=events)
+        for recipe_id in recipe_ids:
+            key = str(recipe_id)
+            recipe = recipes.get(key)
+            if recipe is None:
+                if recipe_id in delete_requested:
+                    loaded.deleted_ids.append(recipe_id)
+                else:
+                    self.log.warning("Recipe missing in Supabase; skipping upsert id=%s", recipe_id)
+                continue
+
+            recipe_ingredients = ingredients.get(key, [])
+            row = {
+                "recipe": recipe,
+                "nutrition_facts": nutrition.get(key, []),
+                "ingredients": recipe_ingredients,
+                "ratings": ratings.get(key),
+                # Keep sets: edges to anything else are stale and get deleted.
+                "ingredient_ids": [ing["id"] for ing in recipe_ingredients],
+                "product_ids": [ing["product_id"] for ing in recipe_ingredients if ing["product_id"] is not None],
+            }
+            loaded.upserts.append(row)
+        return loaded
+
+    async def write_batch(self, loaded: LoadedBatch) -> None:
+        """Apply a loaded batch: deletes first, then upserts sharded across concurrent sessions."""
+        loaded_count = len(loaded.upserts)
+        async with self.neo4j.session() as session:
+            if loaded.deleted_ids:
+                await self.neo4j.write(_DELETE_CYPHER, {"ids": loaded.deleted_ids}, session=session)
+
+            if loaded.upserts:
+                await self._resolve_nutrients(loaded.upserts, session)
+                _stamp_content_hashes(loaded.upserts)
+
+            if self.settings.skip_unchanged and loaded.upserts:
+                loaded.upserts = await self._drop_unchanged(loaded.upserts, session)
+
+            if loaded.upserts:
+                shards = _shard_by_recipe(loaded.upserts, self.settings.neo4j_pool_size - 1)
+                # Wait for every shard before surfacing a failure so no write is still running during the retry.
+                results = await asyncio.gather(
+                    *(self._write_shard(shard, session if index == 0 else None) for index, shard in enumerate(shards)),
+                    return_exceptions=True,
+                )
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+
+        # One summary line per batch; per-recipe detail only when DEBUG is on.
+        if self.log.isEnabledFor(logging.DEBUG):
+            for row in loaded.upserts:
+                self.log.debug(
+                    "Upserted recipe aggregate id=%s nutrition_values=%d ingredients=%d ratings=%s",
+                    row["recipe"]["id"],
+                    len(row["nutrition_facts"]),
+                    len(row["ingredients"]),
+                    row["ratings"],
                 )
+            if loaded.deleted_ids:
+                self.log.debug("Deleted recipes from graph ids=%s", loaded.deleted_ids)
+        if self.log.isEnabledFor(logging.INFO):
+            self.log.info(
+                "Applied recipe batch upserted=%d unchanged=%d deleted=%d ingredients=%d nutrition_values=%d",
+                len(loaded.upserts),
+                loaded_count - len(loaded.upserts),
+                len(loaded.deleted_ids),
+                sum(len(row["ingredients"]) for row in loaded.upserts),
+                sum(len(row["nutrition_facts"]) for row in loaded.upserts),
+            )
+
+    async def _drop_unchanged(self, upserts: List[Dict], session: Optional[AsyncSession] = None) -> List[Dict]:
+        """Skip recipes whose stored content hash already matches, e.g. replayed or duplicate events."""
+        rows = await self.neo4j.read(
+            _UNCHANGED_RECIPES_CYPHER,
+            {"rows": [{"id": row["recipe"]["id"], "content_hash": row["content_hash"]} for row in upserts]},
+            session=session,
+        )
+        unchanged = {str(row["id"]) for row in rows}
+        return [row for row in upserts if str(row["recipe"]["id"]) not in unchanged]
+
+    async def _write_shard(self, shard: List[Dict], session: Optional[AsyncSession] = None) -> None:
+        params = {"batch": shard}
+        child_rows = sum(len(row["ingredients"]) + len(row["nutrition_facts"]) for row in shard)
+        if child_rows <= self.settings.neo4j_chunk_threshold_rows:
+            await self.neo4j.write_all([(cypher, params) for cypher in _UPSERT_CYPHERS], session=session)
             return
 
-        with self.pg_pool.connection() as conn:
-            nutrition = self.load_nutrition_facts(conn, event.aggregate_id)
-            ingredients = self.load_ingredients(conn, event.aggregate_id)
-            ratings = self.load_ratings(conn, event.aggregate_id)
-
-        params = {
-            "recipe": recipe,
-            "nutrition_facts": nutrition,
-            "ingredients": ingredients,
-            "ratings": ratings,
-        }
-        self.neo4j.write(self._upsert_cypher(), params)
-        self.log.info(
-            "Upserted recipe aggregate",
-            extra={
-                "id": event.aggregate_id,
-                "nutrition_values": len(nutrition),
-                "ingredients": len(ingredients),
-                "ratings": ratings,
-            },
+        # Oversized shard: let Neo4j commit in chunks to bound transaction memory.
+        self.log.info("Writing oversized recipe shard in chunked transactions rows=%d", child_rows)
+        await self.neo4j.write_autocommit(
+            [(cypher, params) for cypher in self._chunked_upsert_cyphers], session=session
         )
+
+    def load_isolated(self, conn, events: List[OutboxEvent]) -> LoadedBatch:
+        """``load_batch`` inside a savepoint, so a failed read leaves the caller's transaction usable."""
+        with pg.savepoint(conn, "load_batch"):
+            return self.load_batch(conn, events)
+
+    async def handle_events(self, conn, events: List[OutboxEvent]) -> None:
+        """Load and write a batch of events; the Postgres reads run off the event loop."""
+        loaded = await asyncio.to_thread(self.load_isolated, conn, events)
+        await self.write_batch(loaded)
@@ -1,58 +1,146 @@
-import time
-from typing import List
+import asyncio
+from typing import List, Optional, Tuple
 
 from src.adapters.neo4j.client import Neo4jClient
-from src.adapters.queue.outbox import fetch_pending_events, mark_failed, mark_processed
-from src.adapters.supabase.db import PostgresPool
+from src.adapters.queue.listener import OutboxListener
+from src.adapters.queue.outbox import (
+    fetch_pending_events,
+    mark_failed_many,
+    mark_processed_many,
+)
+from src.adapters.supabase.db import PostgresPool, savepoint
 from src.config.settings import Settings
-from src.domain.models.events import OutboxEvent
-from src.pipelines.recipe_pipeline import RecipePipeline
+from src.pipelines.recipe_pipeline import LoadedBatch, RecipePipeline
 from src.utils.logging import configure_logging
 
 
-def process_batch(pipeline: RecipePipeline, events: List[OutboxEvent], pg_pool: PostgresPool, log):
+def claim_batch(pipeline: RecipePipeline, conn, settings: Settings) -> Optional[LoadedBatch]:
+    """Lock the next pending events and load their aggregates, leaving the transaction open."""
+    conn.autocommit = False
+    events = fetch_pending_events(
+        conn,
+        settings.batch_size,
+        settings.max_attempts,
+        table_names=["recipes", "nutrition_facts", "recipe_ingredients", "recipe_ratings", "cuisines"],
+        aggregate_types=["recipe"],
+    )
+    if not events:
+        conn.rollback()
+        return None
+    try:
+        return pipeline.load_isolated(conn, events)
+    except Exception as exc:  # noqa: BLE001
+        return LoadedBatch(events=events, load_error=exc)
+
+
+def settle_events(conn, processed_ids: List[str], failures: List[Tuple[str, str]]) -> None:
+    """Mark events processed or failed and commit."""
+    with savepoint(conn, "settle_events"):
+        mark_processed_many(conn, processed_ids)
+        mark_failed_many(conn, failures)
+    conn.commit()
+
+
+async def process_batch(pipeline: RecipePipeline, conn, loaded: LoadedBatch, log) -> None:
+    events = loaded.events
+    try:
+        if loaded.load_error is not None:
+            raise loaded.load_error
+        await pipeline.write_batch(loaded)
+        await asyncio.to_thread(settle_events, conn, [event.id for event in events], [])
+        return
+    except Exception:  # noqa: BLE001
+        # Fall back to one event at a time so a single bad recipe cannot fail the whole batch.
+        log.exception("Failed processing recipe batch; retrying events individually events=%d", len(events))
+
+    processed_ids: List[str] = []
+    failures: List[Tuple[str, str]] = []
     for event in events:
         try:
-            pipeline.handle_event(event)
-            with pg_pool.connection() as conn:
-                mark_processed(conn, event.id)
+            await pipeline.handle_events(conn, [event])
+            processed_ids.append(event.id)
         except Exception as exc:  # noqa: BLE001
-            log.exception("Failed processing recipe event", extra={"event_id": event.id, "aggregate_id": event.aggregate_id})
-            with pg_pool.connection() as conn:
-                mark_failed(conn, event.id, str(exc))
+            log.exception("Failed processing recipe event event_id=%s aggregate_id=%s", event.id, event.aggregate_id)
+            failures.append((event.id, str(exc)))
+    await asyncio.to_thread(settle_events, conn, processed_ids, failures)
 
 
-def main():
-    settings = Settings()
-    log = configure_logging("recipe_worker")
-    log.info("Starting recipe worker", extra={"pipeline": settings.pipeline_name})
+async def load_batches(
+    queue: asyncio.Queue,
+    slots: asyncio.Semaphore,
+    pipeline: RecipePipeline,
+    pg_pool: PostgresPool,
+    listener: OutboxListener,
+    settings: Settings,
+):
+    """Producer: claim and load batches while the writer is busy; sleep on LISTEN once drained."""
+    while True:
+        await slots.acquire()
+        try:
+            conn = await asyncio.to_thread(pg_pool.acquire)
+        except BaseException:
+            slots.release()
+            raise
+        try:
+            loaded = await asyncio.to_thread(claim_batch, pipeline, conn, settings)
+        except BaseException:
+            pg_pool.release(conn)
+            slots.release()
+            raise
 
+        if loaded is None:
+            pg_pool.release(conn)
+            slots.release()
+            await listener.wait(settings.poll_interval_seconds)
+            continue
+
+        queue.put_nowait((conn, loaded))
+
+
+async def write_batches(
+    queue: asyncio.Queue, slots: asyncio.Semaphore, pipeline: RecipePipeline, pg_pool: PostgresPool, log
+):
+    """Consumer: write each loaded batch to Neo4j, settle its outbox rows and return the connection."""
+    while True:
+        conn, loaded = await queue.get()
+        try:
+            await process_batch(pipeline, conn, loaded, log)
+        finally:
+            pg_pool.release(conn)
+            slots.release()
+            queue.task_done()
+
+
+async def run(settings: Settings, log) -> None:
     pg_pool = PostgresPool(settings.supabase_dsn)
-    neo4j = Neo4jClient(settings.neo4j_uri, settings.neo4j_user, settings.neo4j_password)
+    neo4j = Neo4jClient(
+        settings.neo4j_uri,
+        settings.neo4j_user,
+        settings.neo4j_password,
+        max_connection_pool_size=settings.neo4j_pool_size,
+    )
     pipeline = RecipePipeline(settings, pg_pool, neo4j)
+    listener = OutboxListener(settings.supabase_dsn, settings.notify_channel)
 
+    # At most one batch being written and one loaded ahead.
+    slots = asyncio.Semaphore(2)
+    queue: asyncio.Queue = asyncio.Queue()
     try:
-        while True:
-            with pg_pool.connection() as conn:
-                conn.autocommit = False
-                events = fetch_pending_events(
-                    conn,
-                    settings.batch_size,
-                    settings.max_attempts,
-                    table_names=["recipes", "nutrition_facts", "recipe_ingredients", "recipe_ratings", "cuisines"],
-                    aggregate_types=["recipe"],
-                )
-                conn.commit()
-
-            if not events:
-                time.sleep(settings.poll_interval_seconds)
-                continue
-
-            process_batch(pipeline, events, pg_pool, log)
+        async with asyncio.TaskGroup() as tasks:
+            tasks.create_task(load_batches(queue, slots, pipeline, pg_pool, listener, settings))
+            tasks.create_task(write_batches(queue, slots, pipeline, pg_pool, log))
     finally:
-        neo4j.close()
+        listener.close()
+        await neo4j.close()
         pg_pool.close()
 
 
+def main():
+    settings = Settings()
+    log = configure_logging("recipe_worker")
+    log.info("Starting recipe worker", extra={"pipeline": settings.pipeline_name})
+    asyncio.run(run(settings, log))
+
+
 if __name__ == "__main__":
     main()
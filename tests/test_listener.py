@@ -0,0 +1,68 @@
+import asyncio
+
+import psycopg2
+
+from src.adapters.queue import listener as listener_module
+from src.adapters.queue.listener import OutboxListener
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.listens += 1
+
+
+class FakeConnection:
+    def __init__(self, dropped=False):
+        self.dropped = dropped
+        self.notifies = []
+        self.listens = 0
+        self.closed = False
+        self.autocommit = False
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def poll(self):
+        if self.dropped:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    def close(self):
+        self.closed = True
+
+
+def test_wait_reconnects_and_listens_again_when_the_connection_drops(monkeypatch):
+    connections = [FakeConnection(dropped=True), FakeConnection()]
+    opened = []
+
+    def connect(dsn):
+        conn = connections.pop(0)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(listener_module.psycopg2, "connect", connect)
+    listener = OutboxListener("postgresql://localhost/db", "outbox_new")
+
+    assert asyncio.run(listener.wait(1)) is True
+
+    dropped, fresh = opened
+    assert dropped.closed
+    assert fresh.listens == 1 and fresh.autocommit
+    assert listener.drain() == 0
+
+
+def test_wait_returns_pending_notifications_without_blocking(monkeypatch):
+    conn = FakeConnection()
+    conn.notifies.append(object())
+    monkeypatch.setattr(listener_module.psycopg2, "connect", lambda dsn: conn)
+
+    assert asyncio.run(OutboxListener("postgresql://localhost/db", "outbox_new").wait(1)) is True
+    assert conn.notifies == []
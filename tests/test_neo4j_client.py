@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from neo4j.exceptions import ClientError, TransientError
+
+from src.adapters.neo4j.client import Neo4jClient
+
+
+class _Result:
+    async def consume(self):
+        return None
+
+
+class _FlakySession:
+    """Fails the first ``failures`` runs with ``error``, then succeeds."""
+
+    def __init__(self, error, failures):
+        self.error = error
+        self.failures = failures
+        self.calls = []
+
+    async def run(self, cypher, **parameters):
+        self.calls.append(cypher)
+        if self.failures:
+            self.failures -= 1
+            raise self.error
+        return _Result()
+
+
+@pytest.fixture
+def client():
+    # The driver connects lazily, so no server is needed to build one.
+    client = Neo4jClient("neo4j://localhost:7687", "neo4j", "secret")
+    yield client
+    asyncio.run(client.close())
+
+
+def test_write_autocommit_retries_transient_errors(client):
+    session = _FlakySession(TransientError("deadlock"), failures=2)
+
+    asyncio.run(client.write_autocommit([("A", {}), ("B", {})], session=session, backoff_seconds=0))
+
+    assert session.calls == ["A", "A", "A", "B"]
+
+
+def test_write_autocommit_gives_up_after_max_attempts(client):
+    session = _FlakySession(TransientError("deadlock"), failures=3)
+
+    with pytest.raises(TransientError):
+        asyncio.run(client.write_autocommit([("A", {})], session=session, backoff_seconds=0))
+
+    assert session.calls == ["A", "A", "A"]
+
+
+def test_write_autocommit_does_not_retry_client_errors(client):
+    session = _FlakySession(ClientError("syntax"), failures=1)
+
+    with pytest.raises(ClientError):
+        asyncio.run(client.write_autocommit([("A", {})], session=session, backoff_seconds=0))
+
+    assert session.calls == ["A"]
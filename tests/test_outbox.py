@@ -0,0 +1,40 @@
+from src.adapters.queue.outbox import fetch_pending_events
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, rows=()):
+        self.cur = _Cursor(list(rows))
+
+    def cursor(self, *args, **kwargs):
+        return self.cur
+
+
+def test_fetch_pending_events_locks_rows_and_aggregates():
+    conn = FakeConnection()
+
+    assert fetch_pending_events(conn, 50, 5, table_names=["recipes"], aggregate_types=["recipe"]) == []
+
+    (query, params), = conn.cur.executed
+    assert params == [5, ["recipes"], ["recipe"], 50]
+    assert "FOR UPDATE SKIP LOCKED" in query
+    assert "pg_try_advisory_xact_lock(hashtextextended(aggregate_id::text, 0))" in query
+    # The advisory lock is only tried on the claimed rows, never on the whole pending backlog.
+    assert query.index("LIMIT %s") < query.index("pg_try_advisory_xact_lock")
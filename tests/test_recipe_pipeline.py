@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+
+from src.pipelines.recipe_pipeline import (
+    _UPSERT_CYPHERS,
+    RecipePipeline,
+    _content_hash,
+    _group_by_recipe,
+    _in_transactions,
+    _shard_by_recipe,
+    _stamp_content_hashes,
+)
+from tests.conftest import make_event
+
+
+def _row(recipe_id):
+    return {"recipe": {"id": recipe_id}, "nutrition_facts": [], "ingredients": [], "ratings": None}
+
+
+def test_in_transactions_wraps_statement_body():
+    cypher = "UNWIND $batch AS row\nMATCH (r:Recipe {id: row.recipe.id})\nSET r.x = 1;\n"
+
+    wrapped = _in_transactions(cypher, 25)
+
+    assert wrapped == (
+        "UNWIND $batch AS row\nCALL {\n  WITH row\nMATCH (r:Recipe {id: row.recipe.id})\nSET r.x = 1\n} "
+        "IN TRANSACTIONS OF 25 ROWS;"
+    )
+
+
+def test_in_transactions_accepts_every_upsert_statement():
+    for cypher in _UPSERT_CYPHERS:
+        assert _in_transactions(cypher, 10).endswith("IN TRANSACTIONS OF 10 ROWS;")
+
+
+def test_in_transactions_rejects_other_statements():
+    with pytest.raises(ValueError):
+        _in_transactions("MATCH (r:Recipe) RETURN r;", 10)
+
+
+def test_group_by_recipe_drops_leading_column_and_keeps_order():
+    rows = [(1, "a", 10), (1, "b", 20), (2, "c", 30)]
+
+    grouped = _group_by_recipe(["recipe_id", "id", "amount"], rows)
+
+    assert grouped == {
+        "1": [{"id": "a", "amount": 10}, {"id": "b", "amount": 20}],
+        "2": [{"id": "c", "amount": 30}],
+    }
+
+
+def test_group_by_recipe_empty():
+    assert _group_by_recipe(["recipe_id", "id"], []) == {}
+
+
+def test_shard_by_recipe_is_stable_and_bounded():
+    upserts = [_row(str(index)) for index in range(50)]
+
+    shards = _shard_by_recipe(upserts, 7)
+    again = _shard_by_recipe(list(reversed(upserts)), 7)
+
+    assert len(shards) <= 7
+    assert all(shards)
+    assert sorted(row["recipe"]["id"] for shard in shards for row in shard) == sorted(
+        row["recipe"]["id"] for row in upserts
+    )
+    placement = {row["recipe"]["id"]: index for index, shard in enumerate(shards) for row in shard}
+    again_placement = {row["recipe"]["id"]: index for index, shard in enumerate(again) for row in shard}
+    assert placement == again_placement
+
+
+def test_shard_by_recipe_never_exceeds_row_count_or_drops_below_one():
+    assert len(_shard_by_recipe([_row("a")], 7)) == 1
+    assert len(_shard_by_recipe([_row("a"), _row("b")], 0)) == 1
+    assert _shard_by_recipe([], 7) == []
+
+
+def test_content_hash_ignores_key_order():
+    assert _content_hash({"a": 1, "b": [1, 2]}) == _content_hash({"b": [1, 2], "a": 1})
+
+
+def test_content_hash_changes_with_content():
+    assert _content_hash({"a": 1}) != _content_hash({"a": 2})
+    assert _content_hash({"a": [1, 2]}) != _content_hash({"a": [2, 1]})
+
+
+def test_stamp_content_hashes_follows_resolved_element_ids():
+    row = _row("a")
+    row["nutrition_facts"] = [{"id": "nf-a", "nutrient_id": "n1", "nutrient_element_id": None}]
+
+    _stamp_content_hashes([row])
+    unresolved = row["content_hash"]
+    _stamp_content_hashes([row])
+    assert row["content_hash"] == unresolved
+
+    row["nutrition_facts"][0]["nutrient_element_id"] = "4:abc:1"
+    _stamp_content_hashes([row])
+    assert row["content_hash"] != unresolved
+
+
+def _pipeline(settings, monkeypatch, recipes, ingredients=None):
+    pipeline = RecipePipeline(settings, pg_pool=None, neo4j=None)
+    monkeypatch.setattr(
+        pipeline, "load_aggregates", lambda conn, recipe_ids: (recipes, {}, ingredients or {}, {})
+    )
+    return pipeline
+
+
+def test_load_batch_deletes_only_absent_recipes_with_a_delete_event(settings, monkeypatch):
+    recipes = {"kept": {"id": "kept"}}
+    pipeline = _pipeline(settings, monkeypatch, recipes)
+    events = [
+        make_event("e1", "gone", op="DELETE"),
+        make_event("e2", "missing", op="UPDATE"),
+        make_event("e3", "kept", op="DELETE"),
+    ]
+
+    loaded = pipeline.load_batch(None, events)
+
+    assert loaded.deleted_ids == ["gone"]
+    assert [row["recipe"]["id"] for row in loaded.upserts] == ["kept"]
+    assert loaded.events == events
+
+
+def test_load_batch_collapses_duplicate_events_and_builds_keep_sets(settings, monkeypatch):
+    ingredients = {
+        "r1": [
+            {"id": "i1", "product_id": "p1"},
+            {"id": "i2", "product_id": None},
+        ]
+    }
+    pipeline = _pipeline(settings, monkeypatch, {"r1": {"id": "r1"}}, ingredients)
+
+    loaded = pipeline.load_batch(None, [make_event("e1", "r1"), make_event("e2", "r1")])
+
+    assert len(loaded.upserts) == 1
+    row = loaded.upserts[0]
+    assert row["ingredient_ids"] == ["i1", "i2"]
+    assert row["product_ids"] == ["p1"]
+    assert row["ratings"] is None
+
+
+class _DefinitionsClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.reads = 0
+
+    async def read(self, cypher, parameters, session=None):
+        self.reads += 1
+        return self.rows
+
+
+def test_resolve_nutrients_negative_caches_missing_ids(settings, monkeypatch):
+    neo4j = _DefinitionsClient([{"id": "n1", "element_id": "4:abc:1"}])
+    pipeline = RecipePipeline(settings, pg_pool=None, neo4j=neo4j)
+    warnings = []
+    monkeypatch.setattr(pipeline.log, "warning", lambda message, *args: warnings.append(message % args))
+
+    def batch():
+        row = _row("a")
+        row["nutrition_facts"] = [{"id": "f1", "nutrient_id": "n1"}, {"id": "f2", "nutrient_id": "gone"}]
+        return [row]
+
+    first, second = batch(), batch()
+    asyncio.run(pipeline._resolve_nutrients(first))
+    asyncio.run(pipeline._resolve_nutrients(second))
+
+    assert [fact["nutrient_element_id"] for fact in second[0]["nutrition_facts"]] == ["4:abc:1", None]
+    assert neo4j.reads == 1
+    assert warnings == ["Nutrient definitions missing from Neo4j: gone"]
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+
+import pytest
+
+from src.pipelines.recipe_pipeline import LoadedBatch
+from src.workers import runner
+from tests.conftest import make_event
+
+log = logging.getLogger("test_runner")
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.statements.append(repr(query))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.autocommit = True
+
+    def cursor(self, *args, **kwargs):
+        return _Cursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def rolled_back_to(self, name):
+        return any("ROLLBACK TO SAVEPOINT" in statement and name in statement for statement in self.statements)
+
+
+class FakePipeline:
+    def __init__(self, fail_batch=False, failing_aggregates=(), fail_load=False):
+        self.fail_batch = fail_batch
+        self.failing_aggregates = set(failing_aggregates)
+        self.fail_load = fail_load
+        self.written = []
+        self.handled = []
+
+    def load_isolated(self, conn, events):
+        if self.fail_load:
+            raise RuntimeError("load failed")
+        return LoadedBatch(events=events)
+
+    async def write_batch(self, loaded):
+        self.written.append([event.id for event in loaded.events])
+        if self.fail_batch:
+            raise RuntimeError("batch failed")
+
+    async def handle_events(self, conn, events):
+        self.handled.append([event.id for event in events])
+        if events[0].aggregate_id in self.failing_aggregates:
+            raise RuntimeError(f"bad recipe {events[0].aggregate_id}")
+
+
+@pytest.fixture
+def marks(monkeypatch):
+    recorded = {"processed": [], "failed": [], "fail_next_processed": 0}
+
+    def mark_processed_many(conn, event_ids):
+        if recorded["fail_next_processed"]:
+            recorded["fail_next_processed"] -= 1
+            raise RuntimeError("update failed")
+        recorded["processed"].extend(event_ids)
+
+    def mark_failed_many(conn, failures):
+        recorded["failed"].extend(failures)
+
+    monkeypatch.setattr(runner, "mark_processed_many", mark_processed_many)
+    monkeypatch.setattr(runner, "mark_failed_many", mark_failed_many)
+    return recorded
+
+
+def _events():
+    return [make_event("e1", "r1"), make_event("e2", "r2"), make_event("e3", "r3")]
+
+
+def test_process_batch_writes_once_and_settles_everything(marks):
+    conn, pipeline = FakeConnection(), FakePipeline()
+
+    asyncio.run(runner.process_batch(pipeline, conn, LoadedBatch(events=_events()), log))
+
+    assert pipeline.written == [["e1", "e2", "e3"]]
+    assert pipeline.handled == []
+    assert marks["processed"] == ["e1", "e2", "e3"]
+    assert marks["failed"] == []
+    assert conn.commits == 1
+
+
+def test_failed_batch_falls_back_to_single_events(marks):
+    conn, pipeline = FakeConnection(), FakePipeline(fail_batch=True, failing_aggregates={"r2"})
+
+    asyncio.run(runner.process_batch(pipeline, conn, LoadedBatch(events=_events()), log))
+
+    assert pipeline.handled == [["e1"], ["e2"], ["e3"]]
+    assert marks["processed"] == ["e1", "e3"]
+    assert marks["failed"] == [("e2", "bad recipe r2")]
+    assert conn.commits == 1
+    assert conn.rollbacks == 0
+
+
+def test_load_error_skips_batch_write_and_falls_back(marks):
+    conn, pipeline = FakeConnection(), FakePipeline()
+    loaded = LoadedBatch(events=_events(), load_error=RuntimeError("load failed"))
+
+    asyncio.run(runner.process_batch(pipeline, conn, loaded, log))
+
+    assert pipeline.written == []
+    assert pipeline.handled == [["e1"], ["e2"], ["e3"]]
+    assert marks["processed"] == ["e1", "e2", "e3"]
+
+
+def test_settle_failure_rolls_back_to_savepoint_and_falls_back(marks):
+    conn, pipeline = FakeConnection(), FakePipeline()
+    marks["fail_next_processed"] = 1
+
+    asyncio.run(runner.process_batch(pipeline, conn, LoadedBatch(events=_events()), log))
+
+    assert conn.rolled_back_to("settle_events")
+    assert conn.rollbacks == 0
+    assert pipeline.handled == [["e1"], ["e2"], ["e3"]]
+    assert marks["processed"] == ["e1", "e2", "e3"]
+    assert conn.commits == 1
+
+
+def test_claim_batch_without_events_releases_the_transaction(monkeypatch, settings):
+    monkeypatch.setattr(runner, "fetch_pending_events", lambda *args, **kwargs: [])
+    conn = FakeConnection()
+
+    assert runner.claim_batch(FakePipeline(), conn, settings) is None
+    assert conn.rollbacks == 1
+    assert conn.autocommit is False
+
+
+def test_claim_batch_keeps_the_claim_when_loading_fails(monkeypatch, settings):
+    events = _events()
+    monkeypatch.setattr(runner, "fetch_pending_events", lambda *args, **kwargs: events)
+    conn = FakeConnection()
+
+    loaded = runner.claim_batch(FakePipeline(fail_load=True), conn, settings)
+
+    assert loaded.events == events
+    assert isinstance(loaded.load_error, RuntimeError)
+    assert conn.rollbacks == 0
+
+
+def test_run_stops_the_writer_before_closing_resources(monkeypatch, settings):
+    events = []
+
+    class FakePool:
+        def __init__(self, dsn):
+            self.closed = False
+
+        def release(self, conn):
+            assert not self.closed, "pool closed while the writer still held a connection"
+            events.append("released")
+
+        def close(self):
+            self.closed = True
+            events.append("pool closed")
+
+    class FakeNeo4j:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def close(self):
+            events.append("neo4j closed")
+
+    class FakeListener:
+        def __init__(self, dsn, channel):
+            pass
+
+        def close(self):
+            events.append("listener closed")
+
+    async def failing_producer(queue, slots, pipeline, pg_pool, listener, settings):
+        await asyncio.sleep(0)
+        raise RuntimeError("claim failed")
+
+    async def busy_writer(queue, slots, pipeline, pg_pool, log):
+        try:
+            await asyncio.Event().wait()
+        finally:
+            pg_pool.release(object())
+
+    monkeypatch.setattr(runner, "PostgresPool", FakePool)
+    monkeypatch.setattr(runner, "Neo4jClient", FakeNeo4j)
+    monkeypatch.setattr(runner, "OutboxListener", FakeListener)
+    monkeypatch.setattr(runner, "RecipePipeline", lambda *args: None)
+    monkeypatch.setattr(runner, "load_batches", failing_producer)
+    monkeypatch.setattr(runner, "write_batches", busy_writer)
+
+    with pytest.raises(ExceptionGroup):
+        asyncio.run(runner.run(settings, log))
+
+    assert events == ["released", "listener closed", "neo4j closed", "pool closed"]